@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Справочные данные калькулятора ОСЭЭК: отрасли, критерии, уровни оценки,
+действия для рекомендаций и поиск отрасли по ОКВЭД.
+
+Вынесены из app.py: Streamlit выполняет основной скрипт заново при каждом
+взаимодействии, а импортированный модуль загружается один раз на процесс,
+поэтому производные структуры (массивы, префиксное дерево) строятся однократно.
+"""
+
+import math
+from types import MappingProxyType
+
+import numpy as np
+
+# Отрасли с X_ref и K_risk (ОТКАЛИБРОВАННЫЕ ЗНАЧЕНИЯ)
+_INDUSTRY_DATA_RAW = {
+    "Энергетика и ТЭК (нефть, газ, электроэнергетика)": {
+        "x_ref": 60000,
+        "k_risk": 1.10,
+        "category": "high",
+        "examples": "Газпром, Роснефть, Лукойл, Россети",
+        "okved_prefixes": ("06", "09.1", "35")
+    },
+    "Атомная энергетика": {
+        "x_ref": 60000,
+        "k_risk": 1.10,
+        "category": "high",
+        "examples": "Росатом",
+        "okved_prefixes": ("24.46",)
+    },
+    "Банки и финансовые услуги": {
+        "x_ref": 55000,
+        "k_risk": 1.0,
+        "category": "high",
+        "examples": "Сбер, ВТБ, Альфа-Банк",
+        "okved_prefixes": ("64", "65", "66")
+    },
+    "Оборонно-промышленный комплекс": {
+        "x_ref": 45000,
+        "k_risk": 1.10,
+        "category": "high",
+        "examples": "Ростех, ОАК, ОСК",
+        "okved_prefixes": ("25.4", "30.11", "30.3")
+    },
+    "Телекоммуникации и IT": {
+        "x_ref": 45000,
+        "k_risk": 1.0,
+        "category": "medium",
+        "examples": "МТС, Мегафон, Ростелеком, Яндекс",
+        "okved_prefixes": ("61", "62", "63")
+    },
+    "Ритейл и электронная коммерция": {
+        "x_ref": 40000,
+        "k_risk": 1.0,
+        "category": "medium",
+        "examples": "X5 Group, Магнит, Ozon, Wildberries",
+        "okved_prefixes": ("47",)
+    },
+    "Строительство и девелопмент": {
+        "x_ref": 35000,
+        "k_risk": 1.0,
+        "category": "medium",
+        "examples": "ПИК, Самолет, ЛСР, Эталон",
+        "okved_prefixes": ("41", "42", "43")
+    },
+    "Металлургия и горнодобыча": {
+        "x_ref": 35000,
+        "k_risk": 1.10,
+        "category": "medium",
+        "examples": "Норникель, НЛМК, Северсталь, АЛРОСА",
+        "okved_prefixes": ("07", "08", "24")
+    },
+    "Транспорт и логистика": {
+        "x_ref": 30000,
+        "k_risk": 1.0,
+        "category": "medium",
+        "examples": "РЖД, Аэрофлот, FESCO",
+        "okved_prefixes": ("49", "50", "51", "52")
+    },
+    "Химическая промышленность": {
+        "x_ref": 25000,
+        "k_risk": 1.10,
+        "category": "medium",
+        "examples": "Сибур, ФосАгро, Уралхим",
+        "okved_prefixes": ("20", "21")
+    },
+    "Машиностроение": {
+        "x_ref": 25000,
+        "k_risk": 1.0,
+        "category": "medium",
+        "examples": "КАМАЗ, ГАЗ, Трансмашхолдинг",
+        "okved_prefixes": ("28", "29")
+    },
+    "Фармацевтика и медицина": {
+        "x_ref": 25000,
+        "k_risk": 1.0,
+        "category": "medium",
+        "examples": "Р-Фарм, Биокад, Герофарм",
+        "okved_prefixes": ("21", "86")
+    },
+    "Агропромышленный комплекс": {
+        "x_ref": 20000,
+        "k_risk": 1.0,
+        "category": "low",
+        "examples": "Русагро, Черкизово, Мираторг",
+        "okved_prefixes": ("01", "10", "11")
+    },
+    "Табачная промышленность": {
+        "x_ref": 15000,
+        "k_risk": 1.10,
+        "category": "low",
+        "examples": "",
+        "okved_prefixes": ("12",)
+    },
+    "Алкогольная промышленность": {
+        "x_ref": 15000,
+        "k_risk": 1.10,
+        "category": "low",
+        "examples": "",
+        "okved_prefixes": ("11.0",)
+    },
+    "Другая отрасль": {
+        "x_ref": 20000,
+        "k_risk": 1.0,
+        "category": "low",
+        "examples": "",
+        "okved_prefixes": ()
+    }
+}
+
+# Справочники неизменяемы: случайная запись из кода страницы невозможна
+INDUSTRY_DATA = MappingProxyType({
+    name: MappingProxyType(data) for name, data in _INDUSTRY_DATA_RAW.items()
+})
+
+# Числовые параметры отраслей в виде массивов (структура массивов):
+# при расчете — один поиск в словаре и индексация массивов
+INDUSTRY_LIST = tuple(INDUSTRY_DATA)
+INDUSTRY_INDEX = {name: i for i, name in enumerate(INDUSTRY_LIST)}
+_INDUSTRY_XREF = np.array([INDUSTRY_DATA[name]["x_ref"] for name in INDUSTRY_LIST], dtype=np.float64)
+_INDUSTRY_KRISK = np.array([INDUSTRY_DATA[name]["k_risk"] for name in INDUSTRY_LIST], dtype=np.float64)
+_INDUSTRY_CATEGORY = tuple(INDUSTRY_DATA[name]["category"] for name in INDUSTRY_LIST)
+
+def industry_params(industry: str) -> tuple:
+    """Возвращает (x_ref, k_risk, category) для отрасли"""
+    i = INDUSTRY_INDEX[industry]
+    return float(_INDUSTRY_XREF[i]), float(_INDUSTRY_KRISK[i]), _INDUSTRY_CATEGORY[i]
+
+MONTHS = ("Янв", "Фев", "Мар", "Апр", "Май", "Июн", "Июл", "Авг", "Сен", "Окт", "Ноя", "Дек")
+
+# Критерии транспарентности
+TRANSP_CRITERIA = (
+    "Годовой отчёт о деятельности компании опубликован на официальном сайте",
+    "Финансовая отчётность заверена внешним аудитором",
+    "Опубликован отчёт об устойчивом развитии (ESG/КСО)",
+    "Отчётность соответствует международным стандартам (GRI, SASB)",
+    "Раскрыта структура собственности",
+    "Раскрыт состав органов управления (с биографиями или без)",
+    "Раскрыто вознаграждение топ-менеджмента",
+    "Раздел существенных фактов (события, влияющие на стоимость акций) обновляется регулярно",
+    "На сайте указаны контакты для инвесторов, СМИ, соискателей",
+    "Доступна англоязычная версия годового отчёта или сайта"
+)
+
+# Критерии институциональной зрелости (ОБНОВЛЕННЫЙ СПИСОК)
+INST_CRITERIA = (
+    ("В структуре компании есть подразделение по коммуникациям", 10),
+    ("Руководитель по коммуникациям входит в состав топ-менеджмента", 10),
+    ("На сайте компании публикуются корпоративные новости и указаны контакты пресс-службы", 10),
+    ("На сайте компании регулярно публикуются корпоративные новости — не реже 4 раз в месяц", 10),
+    ("Компания ведет официальное сообщество в VK", 5),
+    ("Компания ведет официальный Telegram-канал", 5),
+    ("Коммуникационная стратегия компании публично доступна (на сайте или в годовом отчете)", 10),
+    ("Предусмотрен механизм обратной связи: горячая линия, контакт-центр, форма обращений и др.", 10),
+    ("Существуют антикризисные коммуникационные процедуры (для внутренней оценки)", 10),
+    ("Руководитель по коммуникациям или компания состоит в профессиональной ассоциации (РАСО, АКМР, АКОС и др.)", 10),
+    ("Награды или признание в области коммуникаций за последние 3 года", 10),
+    ("KPI коммуникационного подразделения привязаны к бизнес-показателям компании (для внутренней оценки)", 10),
+    ("Проводится регулярный (не реже раза в год) мониторинг репутации или восприятия стейкхолдерами", 10),
+)
+
+# Формулировки и баллы критериев институциональной зрелости по отдельности
+INST_LABELS, INST_SCORES = zip(*INST_CRITERIA)
+
+# Баллы критериев в виде массива для расчета R_inst
+INST_SCORES_ARR = np.asarray(INST_SCORES, dtype=np.int16)
+
+# Нижние границы уровней (включительно); «Очень высокий» — строго больше 100
+QUALITY_THRESHOLDS = (26, 51, 76, math.nextafter(100, math.inf))
+QUALITY_LEVELS = (
+    ("Критически низкий", "🔴", "#dc3545"),
+    ("Низкий", "🟠", "#fd7e14"),
+    ("Средний", "🟡", "#ffc107"),
+    ("Высокий", "🟢", "#28a745"),
+    ("Очень высокий", "🟢", "#28a745"),
+)
+
+# Справочники для рекомендаций: области, действия по области и приоритеты критериев
+REC_AREAS = ("Транспарентность", "Институциональная зрелость", "HR-бренд", "Медийная активность")
+REC_ACTIONS = (
+    TRANSP_CRITERIA,
+    INST_LABELS,
+    ("Принять участие в Рейтинге работодателей России (hh.ru)",),
+    ("Усилить присутствие в СМИ, увеличить количество публикаций",),
+)
+TRANSP_PRIORITY = 2
+INST_PRIORITY = tuple(2 if score == 10 else 3 for _, score in INST_CRITERIA)
+
+# Очистка названия компании для имени файла отчета
+SAFE_NAME_TRANS = str.maketrans({' ': '_', '"': None, '«': None, '»': None})
+
+def _build_okved_trie() -> dict:
+    """
+    Префиксное дерево ОКВЭД: узел — словарь символ → поддерево,
+    под ключом None хранится отрасль, для которой узел является концом префикса.
+    При совпадающих префиксах остается отрасль, объявленная раньше.
+    """
+    trie = {}
+    for industry, data in INDUSTRY_DATA.items():
+        for prefix in data.get("okved_prefixes", ()):
+            node = trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node.setdefault(None, industry)
+    return trie
+
+_OKVED_TRIE = _build_okved_trie()
+
+def determine_industry_by_okved(okved: str) -> str:
+    """Определение отрасли по коду ОКВЭД (по самому длинному совпавшему префиксу)"""
+    industry = "Другая отрасль"
+    if not okved:
+        return industry
+    
+    node = _OKVED_TRIE
+    for char in okved:
+        node = node.get(char)
+        if node is None:
+            break
+        industry = node.get(None, industry)
+    return industry